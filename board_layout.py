@@ -0,0 +1,6 @@
+# Board size and bitboard layout, shared by mcts.py and mcts_numba.py.
+# Each player has one bitboard with COL_STRIDE bits per column: ROWS playable
+# cells plus one empty sentinel on top, so shifts never wrap between columns.
+ROWS = 6
+COLS = 7
+COL_STRIDE = ROWS + 1
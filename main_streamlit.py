@@ -1,53 +1,73 @@
 import streamlit as st
 
-from mcts import ROWS, COLS
+from mcts import ROWS, COLS, COL_STRIDE, PLAYER_R, PLAYER_Y
 from mcts import is_board_full, check_winner, get_valid_moves, make_move, ai_move
+from mcts import create_board, create_executor
 
 ###############################################################################
 #                          Streamlit Frontend                                 #
 ###############################################################################
-def display_board(board, col1):
+@st.cache_data(max_entries=256)
+def render_board_html(bitboards):
     """
-    Display the board in Streamlit 
+    Build the HTML for a board given its (red, yellow) bitboards.
+    Cached, so reruns that don't change the board skip the rebuild.
     """
-    board_str = ""
+    parts = []
     for row in range(ROWS):
-        row_str = "  "
+        parts.append("  ")
         for col in range(COLS):
-            val = board[row][col]
-            if val == "R":
-                row_str += "🔴 "
-            elif val == "Y":
-                row_str += "🟡 "
+            # Row 0 is the top of the display but the bottom of a bitboard
+            bit = 1 << (col * COL_STRIDE + ROWS - 1 - row)
+            if bitboards[PLAYER_R] & bit:
+                parts.append("🔴 ")
+            elif bitboards[PLAYER_Y] & bit:
+                parts.append("🟡 ")
             else:
-                row_str += "⬜ "
-        row_str += "<br>"
-        board_str += row_str
+                parts.append("⬜ ")
+        parts.append("<br>")
 
     # Add column numbers at the bottom
-    # board_str += "  " + " ".join(str(i + 1) for i in range(COLS))
+    # parts.append("  " + " ".join(str(i + 1) for i in range(COLS)))
     column_numbers = ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣"]
-    board_str += "  "
-    board_str += "  " + " ".join(column_numbers)
-    board_str += "  "
+    parts.append("  ")
+    parts.append("  " + " ".join(column_numbers))
+    parts.append("  ")
+    board_str = "".join(parts)
+
+    return f"<pre style='font-family: monospace; line-height: 1.5;'>{board_str}</pre>"
 
+def display_board(board, col1):
+    """
+    Display the board in Streamlit 
+    """
     with col2:
       st.markdown(
-          f"<pre style='font-family: monospace; line-height: 1.5;'>{board_str}</pre>",
+          render_board_html(tuple(board.bitboards)),
           unsafe_allow_html=True,
       )
                     
+@st.cache_resource
+def get_executor():
+    """
+    Process pool for parallel MCTS, started once and shared by all sessions.
+    None when there is a single usable CPU; the AI then searches serially.
+    """
+    return create_executor()
+
 def init_board():
     """
     Initialize an empty board.
     """
-    return [["." for _ in range(COLS)] for _ in range(ROWS)]
+    return create_board()
 
 def reset_game_state():
     """
     Reset the game state in Streamlit session_state.
     """
     st.session_state.board = init_board()
+    # MCTS transposition table, kept between AI turns of the same game
+    st.session_state.mcts_tree = {}
     st.session_state.game_over = False
     st.session_state.winner = None
     st.session_state.first_choice_made = False
@@ -92,14 +112,14 @@ def main(col1, col2, col3):
                 st.session_state.first_choice_made = True
                 st.session_state.difficulty = difficulty
                 if choice == "Yes":
-                    st.session_state.human_player = "R"
-                    st.session_state.ai_player = "Y"
-                    st.session_state.current_player = "R"
+                    st.session_state.human_player = PLAYER_R
+                    st.session_state.ai_player = PLAYER_Y
+                    st.session_state.current_player = PLAYER_R
                 else:
-                    st.session_state.human_player = "Y"
-                    st.session_state.ai_player = "R"
+                    st.session_state.human_player = PLAYER_Y
+                    st.session_state.ai_player = PLAYER_R
                     # If user picks "No," that means the AI is Red and goes first
-                    st.session_state.current_player = "R"
+                    st.session_state.current_player = PLAYER_R
                 st.rerun()
                 
     # Only show the game interface if the game has started
@@ -140,19 +160,19 @@ def main(col1, col2, col3):
             st.warning("It's a draw!")
             st.stop()
 
-        if check_winner(board, "R"):
+        if check_winner(board, PLAYER_R):
             st.session_state.game_over = True
             # Figure out if human or AI is R
-            if human_player == "R":
+            if human_player == PLAYER_R:
                 st.session_state.winner = "Human"
             else:
                 st.session_state.winner = "AI"
             st.rerun()
 
-        if check_winner(board, "Y"):
+        if check_winner(board, PLAYER_Y):
             st.session_state.game_over = True
             # Figure out if human or AI is Y
-            if human_player == "Y":
+            if human_player == PLAYER_Y:
                 st.session_state.winner = "Human"
             else:
                 st.session_state.winner = "AI"
@@ -164,7 +184,7 @@ def main(col1, col2, col3):
         # -------------------------------------------------------------------------
         if current_player == human_player:
             with col1:
-                if human_player == "R":
+                if human_player == PLAYER_R:
                     st.markdown(f"**Your turn** 🔴: Choose a column:")
                 else:
                     st.markdown(f"**Your turn** 🟡: Choose a column:")
@@ -196,7 +216,7 @@ def main(col1, col2, col3):
                         st.rerun()
         else:
             with col1:
-                if ai_player == "R":
+                if ai_player == PLAYER_R:
                     st.markdown(f"**AI's turn** 🔴.")
                 else:
                     st.markdown(f"**AI's turn** 🟡.")
@@ -206,7 +226,8 @@ def main(col1, col2, col3):
                 st.session_state.winner = None
                 st.rerun()
             else:
-                col = ai_move(board, ai_player, difficulty)
+                col = ai_move(board, ai_player, difficulty, tt=st.session_state.mcts_tree,
+                              executor=get_executor())
                 new_board = make_move(board, col, ai_player)
                 st.session_state.board = new_board
                 if check_winner(new_board, ai_player):
@@ -237,5 +258,8 @@ if __name__ == "__main__":
     st.divider()
 
     col1, col2, col3 = st.columns(3)
+
+    # Start the MCTS worker processes before the first AI move
+    get_executor()
   
     main(col1, col2, col3)
\ No newline at end of file
@@ -1,10 +1,85 @@
-import copy
+import multiprocessing
+import os
 import time
 import random
 import math
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
-ROWS = 6
-COLS = 7
+from board_layout import ROWS, COLS, COL_STRIDE
+
+try:
+    from mcts_numba import seed_rollouts, simulate_many
+except ImportError:
+    # numba is optional; rollouts fall back to pure Python
+    seed_rollouts = None
+    simulate_many = None
+
+# Rollouts run from each leaf per selection/expansion pass
+ROLLOUTS_PER_LEAF = 8
+# MCTS iterations between checks of the time limit
+TIME_CHECK_INTERVAL = 64
+# Upper bound on the default number of parallel searches; every worker
+# process loads its own copy of numba (~140 MB resident)
+MAX_PARALLEL_SEARCHES = 4
+# Size above which a kept transposition table is pruned after a search, and
+# how many plies below the root are kept on the first pruning pass
+MAX_TT_SIZE = 50000
+TT_PRUNE_DEPTH = 4
+
+# Players are ints so they can index the per-player bitboards directly and
+# the other player is just 'player ^ 1'. The frontend maps them to colours.
+PLAYER_R, PLAYER_Y = 0, 1
+PLAYERS = (PLAYER_R, PLAYER_Y)
+
+
+def _build_win_masks():
+    """
+    Build a bitboard mask for every possible 4-in-a-row line on the board.
+    """
+    masks = []
+    directions = ((1, 0), (0, 1), (1, 1), (1, -1))  # (col step, row step)
+    for col in range(COLS):
+        for row in range(ROWS):
+            for d_col, d_row in directions:
+                end_col = col + 3 * d_col
+                end_row = row + 3 * d_row
+                if not (0 <= end_col < COLS and 0 <= end_row < ROWS):
+                    continue
+                mask = 0
+                for i in range(4):
+                    mask |= 1 << ((col + i * d_col) * COL_STRIDE + row + i * d_row)
+                masks.append(mask)
+    return tuple(masks)
+
+# The 69 winning lines: 24 horizontal, 21 vertical and 12 per diagonal
+WIN_MASKS = _build_win_masks()
+
+# Winning lines through each cell, indexed by bit position (at most 13)
+CELL_WIN_MASKS = tuple(
+    tuple(mask for mask in WIN_MASKS if mask >> bit & 1)
+    for bit in range(COLS * COL_STRIDE)
+)
+
+# Columns from the edges in to the centre. expand_node pops moves off the
+# end of the list, so the centre column, usually the strongest, is tried first.
+MOVE_ORDER = (6, 0, 5, 1, 4, 2, 3)
+
+# Playable columns for each 7-bit valid-move mask (bit c set = column c open),
+# in MOVE_ORDER
+MASK_MOVES = tuple(
+    tuple(col for col in MOVE_ORDER if mask >> col & 1)
+    for mask in range(1 << COLS)
+)
+
+# Zobrist keys: one random 64-bit value per (player, cell), plus one that is
+# mixed in when PLAYER_Y is to move. A fixed seed keeps hashes stable between runs.
+_zobrist_rng = random.Random(0)
+ZOBRIST = tuple(
+    tuple(_zobrist_rng.getrandbits(64) for _ in range(ROWS * COLS))
+    for _ in PLAYERS
+)
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)
 
 ###############################################################################
 #                          MCTS Implementation                                #
@@ -13,224 +88,563 @@ class MCTSNode:
     """
     A node in the MCTS search tree.
     """
-    def __init__(self, board, current_player, parent=None):
+    __slots__ = ("board", "current_player", "key", "parent", "depth", "children",
+                 "child_wins", "child_visits", "visits", "untried_moves", "move_col", "winner")
+
+    def __init__(self, board, current_player, parent=None, move_col=None, winner=None):
+        # Child nodes and the statistics of the move leading to each of them,
+        # indexed by column. A child shared through the transposition table
+        # keeps separate statistics for each parent.
+        self.children = [None] * COLS
+        self.child_wins = [0] * COLS
+        self.child_visits = [0] * COLS
+        self.reset(board, current_player, parent, move_col, winner)
+
+    def reset(self, board, current_player, parent=None, move_col=None, winner=None):
+        """
+        (Re)initialise the node for a new position, so pooled nodes can be reused.
+        """
         self.board = board
         self.current_player = current_player
+        # Transposition table key of the position
+        self.key = position_key(board, current_player)
         self.parent = parent
-        self.children = []
-        self.wins = 0
+        # Number of pieces on the board, which is the same along every path
+        # to a shared node
+        self.depth = parent.depth + 1 if parent is not None else sum(board.heights)
+        # Column played from the parent to reach this node
+        self.move_col = move_col
+        self.children[:] = _NO_CHILDREN
+        self.child_wins[:] = _NO_STATS
+        self.child_visits[:] = _NO_STATS
         self.visits = 0
-        self.untried_moves = get_valid_moves(board)
-    
-    def uct_value(self):
-        """
-        Upper Confidence Bound for Trees (UCT).
-        """
-        if self.visits == 0:
-            return float('inf')
-        return (self.wins / self.visits) + 1.4142 * math.sqrt(
-            math.log(self.parent.visits) / self.visits
-        )
+        # Player who has already won in this position, or None. Won
+        # positions are terminal: they are never expanded.
+        self.winner = winner
+        self.untried_moves = get_valid_moves(board) if winner is None else []
+
 
+_NO_CHILDREN = (None,) * COLS
+_NO_STATS = (0,) * COLS
+
+# Free list of MCTSNode objects from previous searches. It is shared between
+# Streamlit script threads, so it is only touched through single list.extend
+# and list.pop calls, which are atomic.
+_NODE_POOL = []
+
+def _acquire_node(board, current_player, parent=None, move_col=None, winner=None):
+    """
+    Return an MCTSNode for the position, reusing a pooled node if possible.
+    """
+    try:
+        node = _NODE_POOL.pop()
+    except IndexError:
+        # Pool is empty, or another thread took the last node
+        return MCTSNode(board, current_player, parent, move_col, winner)
+    node.reset(board, current_player, parent, move_col, winner)
+    return node
+
+def _release_nodes(nodes):
+    """
+    Return nodes to the pool once their search is over.
+    """
+    for node in nodes:
+        # Drop references so boards and subtrees can be freed
+        node.board = None
+        node.parent = None
+        node.children[:] = _NO_CHILDREN
+        node.untried_moves = None
+    _NODE_POOL.extend(nodes)
+
+
+class Board:
+    """
+    Connect Four position stored as one bitboard per player.
+
+    Bit ``col * (ROWS + 1) + row`` is set when that player has a piece in
+    ``col`` at height ``row`` (row 0 is the bottom). The extra top row of each
+    column is always empty, so shifting a bitboard never wraps a line of four
+    from one column into the next.
+    """
+    __slots__ = ("bitboards", "heights", "hash", "valid_mask")
+
+    def __init__(self, bitboards=None, heights=None, zobrist_hash=0, valid_mask=(1 << COLS) - 1):
+        self.bitboards = bitboards if bitboards is not None else [0, 0]
+        self.heights = heights if heights is not None else [0] * COLS
+        # Zobrist hash of the pieces on the board, updated on every move
+        self.hash = zobrist_hash
+        # Bit c is set while column c is not full
+        self.valid_mask = valid_mask
+
+    def copy(self):
+        return Board(self.bitboards[:], self.heights[:], self.hash, self.valid_mask)
+
+
+def create_board():
+    """
+    Return an empty board.
+    """
+    return Board()
 
 def get_valid_moves(board):
     """
-    Return a list of all valid columns where a move can be made.
+    Return a list of all valid columns where a move can be made,
+    ordered so that the last one is closest to the centre.
     """
-    valid_moves = []
-    for col in range(COLS):
-        if board[0][col] == ".":
-            valid_moves.append(col)
-    return valid_moves
+    return list(MASK_MOVES[board.valid_mask])
 
 def make_move(board, col, player):
     """
-    Place the player's piece ('R' or 'Y') in the given column of the board if valid.
+    Place the player's piece (PLAYER_R or PLAYER_Y) in the given column of the board if valid.
     Returns a new board state (copy) with the move applied.
     """
-    new_board = copy.deepcopy(board)
-    for row in reversed(range(ROWS)):
-        if new_board[row][col] == ".":
-            new_board[row][col] = player
-            break
+    new_board = board.copy()
+    if new_board.heights[col] < ROWS:
+        make_move_inplace(new_board, col, player)
     return new_board
 
+def make_move_inplace(board, col, player):
+    """
+    Drop the player's piece into the given column of the board, mutating it.
+    The column must not be full. Returns the (row, col) of the placed piece.
+    """
+    row = board.heights[col]
+    board.bitboards[player] |= 1 << (col * COL_STRIDE + row)
+    board.heights[col] = row + 1
+    board.hash ^= ZOBRIST[player][col * ROWS + row]
+    if row + 1 == ROWS:
+        board.valid_mask &= ~(1 << col)
+    return row, col
+
+def position_key(board, current_player):
+    """
+    Transposition table key for the board with current_player to move.
+    """
+    return board.hash ^ ZOBRIST_SIDE if current_player == PLAYER_Y else board.hash
+
+def _wins(bitboard):
+    """
+    Return True if the bitboard contains 4 in a row in any direction.
+    """
+    # Vertical, one diagonal, horizontal, other diagonal. 'pairs' marks every
+    # cell that starts two in a row, so two pairs 2 * shift apart make four.
+    for shift in (1, COL_STRIDE - 1, COL_STRIDE, COL_STRIDE + 1):
+        pairs = bitboard & (bitboard >> shift)
+        if pairs & (pairs >> 2 * shift):
+            return True
+    return False
+
 def check_winner(board, player):
     """
     Check if 'player' has 4 in a row somewhere on the board.
     Returns True if player wins, otherwise False.
     """
-    # Horizontal check
-    for row in range(ROWS):
-        for col in range(COLS - 3):
-            if (board[row][col] == player and
-                board[row][col+1] == player and
-                board[row][col+2] == player and
-                board[row][col+3] == player):
-                return True
-    # Vertical check
-    for col in range(COLS):
-        for row in range(ROWS - 3):
-            if (board[row][col] == player and
-                board[row+1][col] == player and
-                board[row+2][col] == player and
-                board[row+3][col] == player):
-                return True
-    # Diagonal (down-right) check
-    for row in range(ROWS - 3):
-        for col in range(COLS - 3):
-            if (board[row][col] == player and
-                board[row+1][col+1] == player and
-                board[row+2][col+2] == player and
-                board[row+3][col+3] == player):
-                return True
-    # Diagonal (up-right) check
-    for row in range(3, ROWS):
-        for col in range(COLS - 3):
-            if (board[row][col] == player and
-                board[row-1][col+1] == player and
-                board[row-2][col+2] == player and
-                board[row-3][col+3] == player):
-                return True
-    return False
+    return _wins(board.bitboards[player])
 
-def get_next_player(current_player):
+def check_winner_at(board, row, col, player):
     """
-    Switch from 'R' to 'Y' or vice versa.
+    Check if the piece 'player' just placed at (row, col), as returned by
+    make_move_inplace, completes 4 in a row. Only the lines through that cell
+    can have been completed by the move, so only those are tested.
     """
-    return "R" if current_player == "Y" else "Y"
+    bitboard = board.bitboards[player]
+    for mask in CELL_WIN_MASKS[col * COL_STRIDE + row]:
+        if bitboard & mask == mask:
+            return True
+    return False
 
 def is_board_full(board):
     """
     Check if the board is completely full (no moves can be made).
     """
-    return all(board[0][col] != "." for col in range(COLS))
+    return board.valid_mask == 0
 
 def simulate_game(board, current_player):
     """
     Simulate a random game (rollout) until we get a winner or a draw.
-    Returns 'R' if Red wins, 'Y' if Yellow wins, or None if draw.
+    Returns PLAYER_R if Red wins, PLAYER_Y if Yellow wins, or None if draw.
+    The board must not already be won; simulate_games checks that.
     """
-    sim_board = copy.deepcopy(board)
+    if simulate_many is not None:
+        winner = simulate_many(board.bitboards[PLAYER_R], board.bitboards[PLAYER_Y],
+                               tuple(board.heights), current_player, 1)[0]
+        return int(winner) if winner >= 0 else None
+
+    sim_board = board.copy()
     sim_player = current_player
     
     while True:
-        moves = get_valid_moves(sim_board)
+        moves = MASK_MOVES[sim_board.valid_mask]
         if not moves:
             # It's a draw
             return None
         
         # Random move
         col = random.choice(moves)
-        sim_board = make_move(sim_board, col, sim_player)
+        row, col = make_move_inplace(sim_board, col, sim_player)
         
         # Check winner
-        if check_winner(sim_board, sim_player):
+        if check_winner_at(sim_board, row, col, sim_player):
             return sim_player
         
-        sim_player = get_next_player(sim_player)
+        sim_player ^= 1
+
+def simulate_games(board, current_player, simulations):
+    """
+    Run several rollouts from the same position.
+    Returns a (red_wins, yellow_wins) tuple; the remaining games were draws.
+    """
+    # The player who just moved may already have four in a row
+    if _wins(board.bitboards[current_player ^ 1]):
+        return (0, simulations) if current_player == PLAYER_R else (simulations, 0)
+
+    if simulate_many is not None:
+        winners = simulate_many(board.bitboards[PLAYER_R], board.bitboards[PLAYER_Y],
+                                tuple(board.heights), current_player, simulations)
+        return int((winners == PLAYER_R).sum()), int((winners == PLAYER_Y).sum())
+
+    wins = {PLAYER_R: 0, PLAYER_Y: 0, None: 0}
+    for _ in range(simulations):
+        wins[simulate_game(board, current_player)] += 1
+    return wins[PLAYER_R], wins[PLAYER_Y]
 
-def expand_node(node):
+def expand_node(node, tt):
     """
     Expand the MCTS node by taking one untried move and creating a child node.
+    If the resulting position is already in the transposition table 'tt',
+    the existing node is linked as the child instead.
+    Returns the column played and the child node.
     """
     move = node.untried_moves.pop()
     new_board = make_move(node.board, move, node.current_player)
-    next_player = get_next_player(node.current_player)
-    child_node = MCTSNode(new_board, next_player, node)
-    node.children.append(child_node)
-    return child_node
+    next_player = node.current_player ^ 1
+    key = position_key(new_board, next_player)
+    child_node = tt.get(key)
+    if child_node is None:
+        won = check_winner_at(new_board, new_board.heights[move] - 1, move, node.current_player)
+        winner = node.current_player if won else None
+        child_node = _acquire_node(new_board, next_player, node, move, winner)
+        tt[key] = child_node
+    node.children[move] = child_node
+    return move, child_node
 
 def best_child(node):
     """
-    Select the child with the best UCT value.
+    Select the column of the child with the best Upper Confidence Bound for
+    Trees (UCT) value, or None if the node has no children.
     """
     best = None
     best_uct = -float('inf')
-    for child in node.children:
-        uct_val = child.uct_value()
+    child_wins = node.child_wins
+    child_visits = node.child_visits
+    # sqrt(log(N) / n) == sqrt(log(N)) / sqrt(n): the parent term is shared
+    # by all children, so compute it once.
+    exploration = 1.4142 * math.sqrt(math.log(node.visits)) if node.visits else 0.0
+    for col, child in enumerate(node.children):
+        if child is None:
+            continue
+        visits = child_visits[col]
+        if visits == 0:
+            return col
+        uct_val = child_wins[col] / visits + exploration / math.sqrt(visits)
         if uct_val > best_uct:
-            best = child
+            best = col
             best_uct = uct_val
     return best
 
-def backpropagate(node, winner):
+def backpropagate(path, red_wins, yellow_wins, simulations):
     """
-    Backpropagate the simulation results up the tree.
+    Backpropagate the results of a batch of simulations along the path of
+    (node, column played) pairs visited from the root; the leaf's column is
+    None. Nodes shared through the transposition table may have more than
+    one parent, so the path is followed rather than node.parent.
     """
-    while node is not None:
-        node.visits += 1
-        # If this node's parent player is the one who ended up winning, 
-        # we do an increment. Actually, if the *previous move* was from 
-        # node.parent.current_player, we can track it differently.
-        # But for simplicity, if winner == node.parent.current_player => node.parent gets credit.
-        if winner is not None and winner == get_next_player(node.current_player):
-            node.wins += 1
-        node = node.parent
+    wins = (red_wins, yellow_wins)
+    for node, col in path:
+        node.visits += simulations
+        if col is None:
+            continue
+        node.child_visits[col] += simulations
+        # Credit the move with the wins of the player who made it
+        node.child_wins[col] += wins[node.current_player]
 
-def mcts(root_board, current_player, simulations=500, time_limit=1.0):
+def _reroot(tt, root_board, current_player):
     """
-    Perform MCTS from the root state and return the column of the best move.
+    Find the node for the position in the transposition table 'tt' kept from
+    earlier searches, and release every node that can no longer be reached
+    from it. Returns the new root, or None (with 'tt' emptied) if the
+    position was never reached.
+    """
+    root_node = tt.get(position_key(root_board, current_player))
+    if root_node is None:
+        _release_nodes(list(tt.values()))
+        tt.clear()
+        return None
+
+    root_node.parent = None
+    root_node.move_col = None
+    reachable = {root_node.key: root_node}
+    stack = [root_node]
+    while stack:
+        node = stack.pop()
+        for child in node.children:
+            if child is not None and child.key not in reachable:
+                reachable[child.key] = child
+                stack.append(child)
+
+    for node in reachable.values():
+        if node.parent is not None and node.parent.key not in reachable:
+            node.parent = None
+    _release_nodes([node for key, node in tt.items() if key not in reachable])
+    tt.clear()
+    tt.update(reachable)
+    return root_node
+
+def _prune_tt(tt, root_depth):
+    """
+    Keep a transposition table kept between searches from growing without
+    bound. While it holds more than MAX_TT_SIZE nodes, nodes more than 'd'
+    plies below the root are released, starting at d = TT_PRUNE_DEPTH and
+    lowering d until enough are gone. Shallow nodes, which carry the most
+    visits, are kept; those on the cut lose their children and are
+    expanded again if the search reaches them.
+    """
+    max_depth = root_depth + TT_PRUNE_DEPTH
+    while len(tt) > MAX_TT_SIZE and max_depth > root_depth:
+        evicted = [node for node in tt.values() if node.depth > max_depth]
+        for node in evicted:
+            del tt[node.key]
+        _release_nodes(evicted)
+        for node in tt.values():
+            if node.depth == max_depth and node.winner is None:
+                node.children[:] = _NO_CHILDREN
+                node.child_wins[:] = _NO_STATS
+                node.child_visits[:] = _NO_STATS
+                node.untried_moves = get_valid_moves(node.board)
+        max_depth -= 1
+
+def mcts_root_visits(root_board, current_player, time_limit=1.0, tt=None):
+    """
+    Perform MCTS from the root state and return a dict mapping each column
+    explored from the root to its visit count.
+    Pass the same dict as 'tt' on every turn of a game to keep the search
+    tree between moves: the subtree of the position actually reached is
+    reused and the rest is discarded.
     """
-    start_time = time.time()
-    root_node = MCTSNode(root_board, current_player)
+    deadline_ns = time.monotonic_ns() + int(time_limit * 1e9)
+    keep_tree = tt is not None
+    root_node = _reroot(tt, root_board, current_player) if keep_tree else None
+    if root_node is None:
+        root_node = _acquire_node(root_board.copy(), current_player)
+        # Transposition table: positions reached by different move orders
+        # share a single node.
+        tt = {} if tt is None else tt
+        tt[root_node.key] = root_node
     
-    while (time.time() - start_time) < time_limit:
+    iteration = 0
+    # Only read the clock every TIME_CHECK_INTERVAL iterations
+    while iteration % TIME_CHECK_INTERVAL or time.monotonic_ns() < deadline_ns:
+        iteration += 1
+
         # 1. Selection
         node = root_node
-        while not node.untried_moves and node.children:
-            node = best_child(node)
+        path = []
+        while not node.untried_moves:
+            col = best_child(node)
+            if col is None:
+                break
+            path.append((node, col))
+            node = node.children[col]
         
         # 2. Expansion
         if node.untried_moves:
-            node = expand_node(node)
+            col, child = expand_node(node, tt)
+            path.append((node, col))
+            node = child
+        path.append((node, None))
         
-        # 3. Simulation
-        winner = simulate_game(node.board, node.current_player)
+        # 3. Simulation (a won position is scored without playing it out)
+        if node.winner is not None:
+            red_wins = ROLLOUTS_PER_LEAF if node.winner == PLAYER_R else 0
+            yellow_wins = ROLLOUTS_PER_LEAF - red_wins
+        else:
+            red_wins, yellow_wins = simulate_games(node.board, node.current_player, ROLLOUTS_PER_LEAF)
         
         # 4. Backpropagation
-        backpropagate(node, winner)
+        backpropagate(path, red_wins, yellow_wins, ROLLOUTS_PER_LEAF)
+    
+    visits = {
+        col: root_node.child_visits[col]
+        for col, child in enumerate(root_node.children)
+        if child is not None
+    }
     
-    # After time is up, pick the child with the highest visit count.
-    best_move_node = max(root_node.children, key=lambda c: c.visits) if root_node.children else None
+    if keep_tree:
+        _prune_tt(tt, root_node.depth)
+    else:
+        # Every node of the search is in the transposition table exactly once
+        _release_nodes(list(tt.values()))
     
-    if best_move_node is None:
+    return visits
+
+def _best_column(root_board, visits):
+    """
+    Pick the column with the highest visit count.
+    """
+    if not visits:
         # fallback if somehow no children
         return random.choice(get_valid_moves(root_board))
-    
-    # Return the column that leads to best_move_node
-    for col in get_valid_moves(root_board):
-        candidate_board = make_move(root_board, col, current_player)
-        if candidate_board == best_move_node.board:
-            return col
-    
-    return random.choice(get_valid_moves(root_board))
+    return max(visits, key=visits.get)
+
+def mcts(root_board, current_player, simulations=500, time_limit=1.0, tt=None):
+    """
+    Perform MCTS from the root state and return the column of the best move.
+    See mcts_root_visits for 'tt'.
+    """
+    visits = mcts_root_visits(root_board, current_player, time_limit, tt)
+    return _best_column(root_board, visits)
+
+def _init_worker():
+    """
+    Reseed the random generators of a new worker process. Forked workers
+    would otherwise all play the same rollouts.
+    """
+    random.seed()
+    if seed_rollouts is not None:
+        seed_rollouts(random.getrandbits(32))
+
+def _warm_up_worker(_):
+    """
+    Trivial rollout so a worker is started (and numba loaded) ahead of time.
+    """
+    simulate_games(create_board(), PLAYER_R, 1)
+
+def _default_parallel_searches():
+    """
+    Number of searches mcts_parallel runs by default: one per CPU this
+    process may run on (os.cpu_count() ignores affinity and cpusets), capped
+    at MAX_PARALLEL_SEARCHES. CPU quotas such as 'docker --cpus' are not
+    detected; only the cap bounds the count under them.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    return max(min(cpus, MAX_PARALLEL_SEARCHES), 1)
+
+class SearchExecutor(ProcessPoolExecutor):
+    """
+    Process pool for mcts_parallel that keeps count of its idle workers, so
+    searches sharing the pool (e.g. from several Streamlit sessions) only
+    submit work to workers that are free instead of queuing behind each other.
+    """
+    def __init__(self, n_workers, mp_context=None, initializer=None):
+        super().__init__(n_workers, mp_context=mp_context, initializer=initializer)
+        self.n_workers = n_workers
+        self._free_workers = n_workers
+        self._free_lock = threading.Lock()
+
+    def reserve(self, wanted):
+        """
+        Claim up to 'wanted' idle workers and return how many were claimed.
+        """
+        with self._free_lock:
+            count = min(wanted, self._free_workers)
+            self._free_workers -= count
+        return count
+
+    def release(self, count):
+        """
+        Give back workers claimed with reserve once their searches are done.
+        """
+        with self._free_lock:
+            self._free_workers += count
+
+def create_executor(n_workers=None):
+    """
+    Start a SearchExecutor for mcts_parallel and wait until its workers are
+    up. By default one search slot is left for the search mcts_parallel runs
+    itself, and None is returned when that leaves no worker (a single usable
+    CPU), so callers search serially. Workers are started from a clean server
+    process (or spawned) rather than forked, since the caller may be a
+    multithreaded server.
+    """
+    if n_workers is None:
+        n_workers = _default_parallel_searches() - 1
+        if n_workers < 1:
+            return None
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+    else:
+        context = multiprocessing.get_context("spawn")
+    executor = SearchExecutor(n_workers, mp_context=context, initializer=_init_worker)
+    list(executor.map(_warm_up_worker, range(n_workers)))
+    return executor
+
+def mcts_parallel(root_board, current_player, n_workers=None, time_limit=1.0, executor=None, tt=None):
+    """
+    Root-parallel MCTS: run independent searches from the root in
+    n_workers processes and return the column with the most visits summed
+    over all of them. One of the searches runs in this process and can reuse
+    the tree kept in 'tt' (see mcts_root_visits); the other n_workers - 1
+    run in 'executor' (a SearchExecutor), or in a temporary pool if none is
+    given. When an executor is given, n_workers defaults to its size plus
+    one. The executor may be shared with other searches, so only its idle
+    workers are used and fewer searches may run than asked for.
+    """
+    if n_workers is None:
+        if executor is not None:
+            n_workers = executor.n_workers + 1
+        else:
+            n_workers = _default_parallel_searches()
+    own_executor = executor is None and n_workers > 1
+    if own_executor:
+        executor = create_executor(n_workers - 1)
+    reserved = executor.reserve(n_workers - 1) if executor is not None else 0
+    try:
+        futures = [
+            executor.submit(mcts_root_visits, root_board, current_player, time_limit)
+            for _ in range(reserved)
+        ]
+        visits = mcts_root_visits(root_board, current_player, time_limit, tt)
+        for future in futures:
+            for col, count in future.result().items():
+                visits[col] = visits.get(col, 0) + count
+    finally:
+        if reserved:
+            executor.release(reserved)
+        if own_executor:
+            executor.shutdown()
+    return _best_column(root_board, visits)
 
 def find_immediate_win_or_block(board, current_player):
     """
     Check if current_player can immediately win,
     or if the opponent can immediately win next turn (then block).
     """
+    moves = MASK_MOVES[board.valid_mask]
+    heights = board.heights
+    player_bb = board.bitboards[current_player]
+    opponent_bb = board.bitboards[current_player ^ 1]
+
     # Immediate win
-    for col in get_valid_moves(board):
-        temp_board = make_move(board, col, current_player)
-        if check_winner(temp_board, current_player):
+    for col in moves:
+        if _wins(player_bb | 1 << (col * COL_STRIDE + heights[col])):
             return col
     
     # Block opponent
-    opponent = get_next_player(current_player)
-    for col in get_valid_moves(board):
-        temp_board = make_move(board, col, opponent)
-        if check_winner(temp_board, opponent):
+    for col in moves:
+        if _wins(opponent_bb | 1 << (col * COL_STRIDE + heights[col])):
             return col
     
     return None
 
-def ai_move(board, current_player, difficulty):
+def ai_move(board, current_player, difficulty, tt=None, executor=None):
     """
     Decide AI move:
     1. Check immediate win/block
-    2. Otherwise use MCTS
+    2. Otherwise use MCTS, reusing the search tree in 'tt' if given, and
+       searching in parallel in the processes of 'executor' if given
     """
     
     # Difficulty is a value between 1 and 5, If values are between 1 and 4, there is a chance of random move
@@ -252,4 +666,6 @@ def ai_move(board, current_player, difficulty):
     if col is not None:
         return col
                           
-    return mcts(board, current_player, simulations=300, time_limit=1.0)
+    if executor is not None:
+        return mcts_parallel(board, current_player, time_limit=1.0, executor=executor, tt=tt)
+    return mcts(board, current_player, simulations=300, time_limit=1.0, tt=tt)
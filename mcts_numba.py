@@ -0,0 +1,86 @@
+import numpy as np
+from numba import njit
+
+from board_layout import ROWS, COLS, COL_STRIDE
+
+NO_WINNER = -1
+
+###############################################################################
+#                       Numba-compiled Rollouts                               #
+###############################################################################
+@njit(cache=True)
+def _valid_moves(heights, moves):
+    """
+    Fill 'moves' with the playable columns and return how many there are.
+    """
+    count = 0
+    for col in range(COLS):
+        if heights[col] < ROWS:
+            moves[count] = col
+            count += 1
+    return count
+
+@njit(cache=True)
+def _make_move(bbs, heights, col, player):
+    """
+    Drop player's (0 or 1) piece into 'col', mutating bbs and heights.
+    """
+    bbs[player] |= np.int64(1) << (col * COL_STRIDE + heights[col])
+    heights[col] += 1
+
+@njit(cache=True)
+def _check_winner(bb):
+    """
+    Return True if the bitboard contains 4 in a row in any direction.
+    """
+    # Same shift test as _wins in mcts.py, which explains it
+    for shift in (1, COL_STRIDE - 1, COL_STRIDE, COL_STRIDE + 1):
+        pairs = bb & (bb >> shift)
+        if pairs & (pairs >> 2 * shift):
+            return True
+    return False
+
+@njit(cache=True)
+def _simulate(bbs, heights, player, moves):
+    """
+    Play random moves until someone wins or the board is full.
+    Returns the winning player (0 or 1), or NO_WINNER on a draw.
+    """
+    while True:
+        count = _valid_moves(heights, moves)
+        if count == 0:
+            return NO_WINNER
+        col = moves[np.random.randint(count)]
+        _make_move(bbs, heights, col, player)
+        if _check_winner(bbs[player]):
+            return player
+        player = 1 - player
+
+@njit(cache=True)
+def seed_rollouts(seed):
+    """
+    Seed the random generator used by compiled rollouts. Numba keeps its own
+    generator state, separate from Python's and NumPy's.
+    """
+    np.random.seed(seed)
+
+@njit(cache=True)
+def simulate_many(bb_r, bb_y, heights, player, n):
+    """
+    Run 'n' random rollouts from the same position.
+
+    'heights' is a tuple of the 7 column heights and 'player' (PLAYER_R = 0
+    or PLAYER_Y = 1, as in mcts.py) moves first. Returns an int array with
+    the winner of each rollout (0, 1 or NO_WINNER).
+    """
+    winners = np.empty(n, dtype=np.int64)
+    bbs = np.empty(2, dtype=np.int64)
+    sim_heights = np.empty(COLS, dtype=np.int64)
+    moves = np.empty(COLS, dtype=np.int64)
+    for i in range(n):
+        bbs[0] = bb_r
+        bbs[1] = bb_y
+        for col in range(COLS):
+            sim_heights[col] = heights[col]
+        winners[i] = _simulate(bbs, sim_heights, player, moves)
+    return winners